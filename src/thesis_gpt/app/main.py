@@ -5,6 +5,8 @@ from thesis_gpt.app.logger import Logger
 from thesis_gpt.retrieval.retriever import ThesisRetriever
 
 response_generator = ThesisRetriever()
+# Identifier the thesis was indexed under (see `preprocess/main.py --document-id`).
+DOCUMENT_ID = "deforce-phd-thesis"
 
 # Page setup
 st.set_page_config(page_title="Thesis Chat", layout="centered")
@@ -67,7 +69,7 @@ if st.session_state.suggestions_shown:
 if st.session_state.pending_response:
     query, _ = st.session_state.history[-1]
     with st.spinner("Thinking..."):
-        answer = ThesisRetriever.retrieve(query)
+        answer = ThesisRetriever.retrieve(query, DOCUMENT_ID)
     st.session_state.history[-1] = (query, answer)
     st.session_state.pending_response = False
     Logger.log(query, answer, st.session_state.get("native_language", None))
@@ -1,12 +1,20 @@
 import argparse
 import logging
 import os
+import sys
 
 from dotenv import load_dotenv
+from weaviate.classes.query import Filter
+from weaviate.util import generate_uuid5
 
 from thesis_gpt.preprocess.parsers.latex_parser import LatexChunker, LatexDocParser
 from thesis_gpt.preprocess.parsers.utils import validate_latex_path
-from thesis_gpt.preprocess.vectorstore.collections import ThesisCollection
+from thesis_gpt.preprocess.vectorstore.collections import (
+    INDEX_PROFILES,
+    DocumentCatalog,
+    ThesisCollection,
+)
+from thesis_gpt.preprocess.vectorstore.uploader import BatchUploader
 from thesis_gpt.preprocess.vectorstore.weaviate_client import WeaviateDB
 
 logger = logging.getLogger(__name__)
@@ -27,6 +35,48 @@ if __name__ == "__main__":
         type=str,
         help="Path to a LaTeX file or directory containing LaTeX files.",
     )
+    argparser.add_argument(
+        "--document-id",
+        type=str,
+        required=True,
+        help="Identifier of the document in the shared collection.",
+    )
+    argparser.add_argument(
+        "--title", type=str, required=True, help="Title of the document."
+    )
+    argparser.add_argument(
+        "--author", type=str, required=True, help="Author of the document."
+    )
+    argparser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Drop and recreate the shared collections, removing all other documents.",
+    )
+    argparser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Objects per batch. Sized automatically when omitted.",
+    )
+    argparser.add_argument(
+        "--concurrent-requests",
+        type=int,
+        default=4,
+        help="Number of batches sent in parallel (only with --batch-size).",
+    )
+    argparser.add_argument(
+        "--profile",
+        choices=sorted(INDEX_PROFILES),
+        default=None,
+        help="Vector index and property indexing profile, applied when the collection is "
+        "created. Requires --reset if it already exists. Defaults to 'default'.",
+    )
+    argparser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Number of times failed objects are retried.",
+    )
     args = argparser.parse_args()
 
     validate_latex_path(args.path)
@@ -36,26 +86,45 @@ if __name__ == "__main__":
     docs = chunker.chunk(markdown_text)
 
     logger.info(f"Parsed {len(docs)} chunks from the LaTeX document.")
+    if not docs:
+        logger.error("No chunks were parsed, leaving the indexed document untouched.")
+        sys.exit(1)
 
-    db_client = WeaviateDB(headers={"X-Openai-Api-Key": os.getenv("OPENAI_APIKEY")})
-    try:
+    with WeaviateDB(headers={"X-Openai-Api-Key": os.getenv("OPENAI_APIKEY")}) as db_client:
+        exists = db_client.client.collections.exists("thesis_chunks")
+        if args.profile is not None and exists and not args.reset:
+            argparser.error(
+                "--profile only applies when the collection is created; "
+                "pass --reset to rebuild it with the new profile."
+            )
         thesis_data = ThesisCollection(
-            db_client.client, name="thesis_chunks", reset=True
+            db_client.client,
+            name="thesis_chunks",
+            reset=args.reset,
+            profile=INDEX_PROFILES[args.profile or "default"],
+        )
+        catalog = DocumentCatalog(db_client.client, reset=args.reset)
+        objects = ThesisCollection.chunk_properties(args.document_id, docs)
+        # The uploader derives the same UUIDs, so unchanged chunks are overwritten in place and
+        # the previous version of the document stays searchable until the upload succeeds.
+        uuids = [str(generate_uuid5(properties)) for properties in objects]
+        uploader = BatchUploader(
+            thesis_data.collection,
+            batch_size=args.batch_size,
+            concurrent_requests=args.concurrent_requests,
+            max_retries=args.max_retries,
+            filters=ThesisCollection.document_filter(args.document_id)
+            & Filter.by_id().contains_any(uuids),
+        )
+        report = uploader.upload(objects)
+        if report.consistent:
+            deleted = thesis_data.delete_stale_chunks(args.document_id, uuids)
+            logger.info(f"Deleted {deleted} stale chunks of {args.document_id!r}.")
+            catalog.register(args.document_id, args.title, args.author)
+
+    if not report.consistent:
+        logger.error(
+            f"Upload incomplete: {len(report.failed)} objects failed and "
+            f"{report.stored}/{report.expected} objects are stored."
         )
-        chunks_list = list()
-        with thesis_data.collection.batch.fixed_size(batch_size=50) as batch:
-            for i, chunk in enumerate(docs):
-                data_properties = {
-                    "chunk": chunk.page_content,
-                    "chapter": chunk.metadata.get("chapter"),
-                    "section": chunk.metadata.get("section"),
-                    "subsection": chunk.metadata.get("subsection"),
-                    "subsubsection": chunk.metadata.get("subsubsection"),
-                    "paragraph": chunk.metadata.get("paragraph"),
-                    "chunk_index": i,
-                }
-                batch.add_object(properties=data_properties)
-        db_client.close()
-    except:
-        logger.exception("An error occurred while processing the LaTeX document")
-        db_client.close()
+        sys.exit(1)
@@ -0,0 +1,225 @@
+import argparse
+import logging
+import os
+import random
+import statistics
+import time
+from typing import Dict, List
+
+from dotenv import load_dotenv
+from weaviate.collections import Collection
+from weaviate.util import generate_uuid5
+
+from thesis_gpt.preprocess.parsers.latex_parser import LatexChunker, LatexDocParser
+from thesis_gpt.preprocess.parsers.utils import validate_latex_path
+from thesis_gpt.preprocess.vectorstore.collections import (
+    INDEX_PROFILES,
+    IndexProfile,
+    ThesisCollection,
+)
+from thesis_gpt.preprocess.vectorstore.uploader import BatchUploader
+from thesis_gpt.preprocess.vectorstore.weaviate_client import WeaviateDB
+
+logger = logging.getLogger(__name__)
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+
+# Weaviate's defaults, used to estimate the footprint of profiles that leave them unset.
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_PQ_TRAINING_LIMIT = 100_000
+# Approximate bytes per HNSW edge, including allocation overhead.
+BYTES_PER_EDGE = 10
+
+
+def pq_trained(profile: IndexProfile, count: int) -> bool:
+    """
+    Check whether Weaviate has trained and applied PQ, which only happens once the collection
+    holds `pq_training_limit` objects. Until then vectors are stored and searched uncompressed.
+
+    Args:
+        profile (IndexProfile): The index profile.
+        count (int): Number of objects in the collection.
+
+    Returns:
+        bool: True if the profile uses PQ and the vectors are compressed.
+    """
+    if profile.quantizer != "pq":
+        return False
+    return count >= (profile.pq_training_limit or DEFAULT_PQ_TRAINING_LIMIT)
+
+
+def estimate_memory(profile: IndexProfile, count: int, dims: int) -> int:
+    """
+    Estimate the memory held by a collection's vector index. Uncompressed vectors behind a
+    quantizer, and all vectors of an uncached flat index, stay on disk. PQ that has not been
+    trained yet is counted as uncompressed.
+
+    Args:
+        profile (IndexProfile): The index profile.
+        count (int): Number of objects in the collection.
+        dims (int): Vector dimensionality.
+
+    Returns:
+        int: The estimated footprint in bytes.
+    """
+    if pq_trained(profile, count):
+        vectors = count * (profile.pq_segments or dims)
+    elif profile.quantizer == "bq":
+        vectors = count * dims // 8
+    else:
+        vectors = count * dims * 4
+
+    if profile.index == "flat":
+        return vectors if profile.quantizer == "bq" else 0
+    max_connections = profile.max_connections or DEFAULT_MAX_CONNECTIONS
+    return vectors + count * max_connections * BYTES_PER_EDGE
+
+
+def percentile_95(latencies: List[float]) -> float:
+    """
+    Compute the 95th percentile of query latencies, falling back to the maximum for samples
+    too small to interpolate.
+
+    Args:
+        latencies (list): The latency of each query.
+
+    Returns:
+        float: The 95th percentile latency.
+    """
+    if len(latencies) < 2:
+        return max(latencies)
+    return statistics.quantiles(latencies, n=20)[-1]
+
+
+def search(collection: Collection, queries: Dict[str, list], limit: int) -> tuple:
+    """
+    Run vector searches against a collection, timing each query. Queries are vectors of
+    indexed objects, so each query's own object is dropped from its results; otherwise every
+    query would trivially find itself and inflate recall.
+
+    Args:
+        collection (weaviate.Collection): The collection to search.
+        queries (dict): The query vectors, keyed by the UUID of the object they belong to.
+        limit (int): Number of results per query.
+
+    Returns:
+        tuple: The result UUIDs per query and the latency of each query in milliseconds.
+    """
+    results, latencies = list(), list()
+    for uuid, vector in queries.items():
+        start = time.perf_counter()
+        response = collection.query.near_vector(
+            near_vector=vector, limit=limit + 1, return_properties=[]
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = [str(obj.uuid) for obj in response.objects if str(obj.uuid) != uuid]
+        results.append(set(found[:limit]))
+    return results, latencies
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(
+        description="Benchmark memory footprint, query latency and recall per index profile."
+    )
+    argparser.add_argument(
+        "path",
+        type=str,
+        help="Path to a LaTeX file or directory containing LaTeX files.",
+    )
+    argparser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=sorted(INDEX_PROFILES),
+        default=sorted(INDEX_PROFILES),
+        help="Profiles to benchmark.",
+    )
+    argparser.add_argument(
+        "--queries", type=int, default=100, help="Number of sampled query vectors."
+    )
+    argparser.add_argument(
+        "--limit", type=int, default=10, help="Number of results per query (recall@k)."
+    )
+    argparser.add_argument(
+        "--keep", action="store_true", help="Keep the benchmark collections afterwards."
+    )
+    args = argparser.parse_args()
+    if args.queries < 1 or args.limit < 1:
+        argparser.error("--queries and --limit must be at least 1.")
+
+    validate_latex_path(args.path)
+    markdown_text = LatexDocParser(args.path).parse()
+    docs = LatexChunker().chunk(markdown_text)
+    objects = ThesisCollection.chunk_properties("benchmark", docs)
+    logger.info(f"Parsed {len(docs)} chunks from the LaTeX document.")
+
+    with WeaviateDB(headers={"X-Openai-Api-Key": os.getenv("OPENAI_APIKEY")}) as db_client:
+        created = list()
+        rows = list()
+        try:
+            # An uncompressed flat index is an exact search and serves as ground truth. It is
+            # also the only collection that gets vectorized, the others reuse its vectors.
+            exact = ThesisCollection(
+                db_client.client,
+                name="thesis_bench_exact",
+                reset=True,
+                profile=IndexProfile(index="flat"),
+            )
+            created.append(exact.name)
+            BatchUploader(exact.collection).upload(objects)
+            stored: Dict[str, list] = {
+                str(obj.uuid): obj.vector["default"]
+                for obj in exact.collection.iterator(include_vector=True)
+            }
+            uuids = list(stored)
+            queries = {
+                uuid: stored[uuid]
+                for uuid in random.Random(0).sample(uuids, min(args.queries, len(uuids)))
+            }
+            dims = len(stored[uuids[0]])
+            truth, _ = search(exact.collection, queries, args.limit)
+
+            for name in args.profiles:
+                profile = INDEX_PROFILES[name]
+                # Collection names may only contain letters, digits and underscores.
+                bench = ThesisCollection(
+                    db_client.client,
+                    name=f"thesis_bench_{name.replace('-', '_')}",
+                    reset=True,
+                    profile=profile,
+                )
+                created.append(bench.name)
+                report = BatchUploader(bench.collection).upload(
+                    objects,
+                    vectors=[stored[str(generate_uuid5(properties))] for properties in objects],
+                )
+                results, latencies = search(bench.collection, queries, args.limit)
+                recall = statistics.mean(
+                    len(found & expected) / len(expected)
+                    for found, expected in zip(results, truth)
+                    if expected
+                )
+                rows.append(
+                    (
+                        name,
+                        estimate_memory(profile, report.stored, dims) / 2**20,
+                        statistics.median(latencies),
+                        percentile_95(latencies),
+                        recall,
+                        profile.quantizer == "pq" and not pq_trained(profile, report.stored),
+                    )
+                )
+        finally:
+            if not args.keep:
+                for name in created:
+                    db_client.client.collections.delete(name)
+
+    print(f"{len(objects)} objects, {dims} dims, {len(queries)} queries, recall@{args.limit}")
+    print(f"{'profile':<10} {'memory (MiB)':>12} {'p50 (ms)':>9} {'p95 (ms)':>9} {'recall':>7}")
+    for name, memory, p50, p95, recall, untrained in rows:
+        note = "  (PQ not trained: results are uncompressed HNSW)" if untrained else ""
+        print(f"{name:<10} {memory:>12.2f} {p50:>9.1f} {p95:>9.1f} {recall:>7.3f}{note}")
@@ -1,7 +1,108 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Literal
+
 import weaviate
 import weaviate.classes as wvc
 from beartype import beartype
+from langchain_core.documents import Document
 from weaviate.collections import Collection
+from weaviate.util import generate_uuid5
+
+HEADING_PROPERTIES = ["chapter", "section", "subsection", "subsubsection", "paragraph"]
+
+
+@dataclass(frozen=True)
+class IndexProfile:
+    """
+    A dataclass describing the vector index and property indexing of a collection.
+    Settings left as None fall back to Weaviate's defaults. One exception applies to every
+    profile: headings that stay filterable use FIELD tokenization, so heading filters match
+    whole titles rather than single words.
+    Args:
+        index (str): "hnsw" for an approximate graph index, "flat" for brute-force search, which
+            suits small corpora. Defaults to "hnsw".
+        ef (int, optional): HNSW query-time candidate list size. -1 lets Weaviate pick it.
+        ef_construction (int, optional): HNSW build-time candidate list size.
+        max_connections (int, optional): HNSW edges per node.
+        quantizer (str, optional): "pq" for product quantization or "bq" for binary quantization.
+            Flat indexes only support "bq".
+        pq_segments (int, optional): Number of PQ segments per vector.
+        pq_training_limit (int, optional): Number of objects after which PQ is trained.
+        filter_strategy (str, optional): HNSW filtered-search strategy. "acorn" keeps restrictive
+            filters (e.g. a single document in a shared collection) fast.
+        filterable (dict): Per-property override of the filterable (inverted) index.
+        searchable (dict): Per-property override of the searchable (BM25) index.
+    """
+
+    index: Literal["hnsw", "flat"] = "hnsw"
+    ef: int | None = None
+    ef_construction: int | None = None
+    max_connections: int | None = None
+    quantizer: Literal["pq", "bq"] | None = None
+    pq_segments: int | None = None
+    pq_training_limit: int | None = None
+    filter_strategy: Literal["sweeping", "acorn"] | None = None
+    filterable: Dict[str, bool] = field(default_factory=dict)
+    searchable: Dict[str, bool] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.index == "flat" and self.quantizer == "pq":
+            raise ValueError("Flat indexes only support binary quantization (bq).")
+
+    def vector_index_config(self):
+        """
+        Build the Weaviate vector index configuration for this profile.
+        Returns:
+            The vector index configuration to pass on collection creation.
+        """
+        vector_index = wvc.config.Configure.VectorIndex
+        quantizer = None
+        if self.quantizer == "pq":
+            quantizer = vector_index.Quantizer.pq(
+                segments=self.pq_segments, training_limit=self.pq_training_limit
+            )
+        elif self.quantizer == "bq":
+            # Flat indexes read vectors from disk unless the compressed vectors are cached.
+            cache = True if self.index == "flat" else None
+            quantizer = vector_index.Quantizer.bq(cache=cache)
+
+        if self.index == "flat":
+            return vector_index.flat(quantizer=quantizer)
+        return vector_index.hnsw(
+            ef=self.ef,
+            ef_construction=self.ef_construction,
+            max_connections=self.max_connections,
+            filter_strategy=(
+                wvc.config.VectorFilterStrategy(self.filter_strategy)
+                if self.filter_strategy
+                else None
+            ),
+            quantizer=quantizer,
+        )
+
+
+# Headings are only used for display and filtering, the chunk text only for vector search.
+_LEAN = IndexProfile(
+    filterable={"chunk": False},
+    searchable={name: False for name in HEADING_PROPERTIES},
+)
+
+INDEX_PROFILES: Dict[str, IndexProfile] = {
+    "default": IndexProfile(),
+    "lean": replace(_LEAN, ef_construction=64, max_connections=16, filter_strategy="acorn"),
+    "pq": replace(
+        _LEAN,
+        ef_construction=64,
+        max_connections=16,
+        filter_strategy="acorn",
+        quantizer="pq",
+        pq_segments=128,
+        pq_training_limit=1000,
+    ),
+    "bq": replace(_LEAN, quantizer="bq", filter_strategy="acorn"),
+    "flat": replace(_LEAN, index="flat"),
+    "flat-bq": replace(_LEAN, index="flat", quantizer="bq"),
+}
 
 
 @beartype
@@ -9,17 +110,28 @@ class ThesisCollection:
     """
     A class to manage a Weaviate collection for storing Thesis chunks.
     This class handles the creation of the collection, insertion of chunks, and querying by chapter
-    title.
+    title. The collection is shared between documents, every chunk carries the `document_id` of
+    the document it belongs to.
     Args:
         client (weaviate.Client): The Weaviate client instance.
         name (str): The name of the collection.
         reset (bool): If True, resets the collection by deleting it if it exists. Defaults to False.
+        profile (IndexProfile): The vector index and property indexing settings, applied when the
+            collection is created. Defaults to Weaviate's defaults, except for the FIELD
+            tokenization of filterable headings.
     """
 
-    def __init__(self, client: weaviate.client.WeaviateClient, name: str, reset: bool = False):
+    def __init__(
+        self,
+        client: weaviate.client.WeaviateClient,
+        name: str,
+        reset: bool = False,
+        profile: IndexProfile = INDEX_PROFILES["default"],
+    ):
         self.client = client
         self.name = name
         self.model = "gpt-4o"
+        self.profile = profile
 
         if reset and client.collections.exists(name):
             client.collections.delete(name)
@@ -41,23 +153,104 @@ class ThesisCollection:
         Returns:
             weaviate.Collection: The created collection instance.
         """
+        text_properties = ["chunk", *HEADING_PROPERTIES]
+        properties = [
+            wvc.config.Property(
+                name="document_id",
+                data_type=wvc.config.DataType.TEXT,
+                tokenization=wvc.config.Tokenization.FIELD,
+                index_filterable=True,
+                index_searchable=False,
+                skip_vectorization=True,
+            )
+        ]
+        # Filterable headings are matched as a whole, so "Introduction" does not also match
+        # "Introduction to Sensor Data".
+        properties += [
+            wvc.config.Property(
+                name=name,
+                data_type=wvc.config.DataType.TEXT,
+                tokenization=(
+                    wvc.config.Tokenization.FIELD
+                    if name in HEADING_PROPERTIES and self.profile.filterable.get(name) is not False
+                    else None
+                ),
+                index_filterable=self.profile.filterable.get(name),
+                index_searchable=self.profile.searchable.get(name),
+            )
+            for name in text_properties
+        ]
+        properties.append(
+            wvc.config.Property(
+                name="chunk_index",
+                data_type=wvc.config.DataType.INT,
+                index_filterable=self.profile.filterable.get("chunk_index"),
+            )
+        )
         return self.client.collections.create(
             name=self.name,
-            properties=[
-                wvc.config.Property(name="chunk", data_type=wvc.config.DataType.TEXT),
-                wvc.config.Property(name="chapter", data_type=wvc.config.DataType.TEXT),
-                wvc.config.Property(name="section", data_type=wvc.config.DataType.TEXT),
-                wvc.config.Property(name="subsection", data_type=wvc.config.DataType.TEXT),
-                wvc.config.Property(name="subsubsection", data_type=wvc.config.DataType.TEXT),
-                wvc.config.Property(name="paragraph", data_type=wvc.config.DataType.TEXT),
-                wvc.config.Property(name="chunk_index", data_type=wvc.config.DataType.INT),
-            ],
+            properties=properties,
             vectorizer_config=wvc.config.Configure.Vectorizer.text2vec_openai(),
+            vector_index_config=self.profile.vector_index_config(),
             generative_config=wvc.config.Configure.Generative.openai(model=self.model),
         )
 
+    @staticmethod
+    def document_filter(document_id: str):
+        """
+        Build a filter matching the chunks of a single document.
+        Args:
+            document_id (str): The document identifier.
+        Returns:
+            weaviate.classes.query.Filter: The filter.
+        """
+        return wvc.query.Filter.by_property("document_id").equal(document_id)
+
+    def delete_stale_chunks(self, document_id: str, keep: List[str]) -> int:
+        """
+        Delete the chunks of a document left over from a previous upload. Chunks have
+        deterministic UUIDs, so a re-upload overwrites unchanged chunks and only the chunks
+        that are no longer produced remain to be removed.
+        Args:
+            document_id (str): The document identifier.
+            keep (list): The UUIDs of the chunks of the current upload.
+        Returns:
+            int: The number of deleted chunks.
+        """
+        keep_set = set(keep)
+        stale = [
+            str(obj.uuid)
+            for obj in self.collection.iterator(return_properties=["document_id"])
+            if obj.properties["document_id"] == document_id and str(obj.uuid) not in keep_set
+        ]
+        if not stale:
+            return 0
+        self.collection.data.delete_many(where=wvc.query.Filter.by_id().contains_any(stale))
+        return len(stale)
+
+    @staticmethod
+    def chunk_properties(document_id: str, docs: List[Document]) -> List[dict]:
+        """
+        Convert chunked documents into the properties stored in the collection.
+        Args:
+            document_id (str): The identifier of the document the chunks belong to.
+            docs (list): The chunks produced by the LatexChunker.
+        Returns:
+            list: The properties of each chunk, in document order.
+        """
+        return [
+            {
+                "document_id": document_id,
+                "chunk": chunk.page_content,
+                **{name: chunk.metadata.get(name) for name in HEADING_PROPERTIES},
+                "chunk_index": i,
+            }
+            for i, chunk in enumerate(docs)
+        ]
+
     def init_chunk(
         self,
+        document_id: str,
         chunk: str,
         chapter: str | None,
         chunk_index: int,
@@ -69,6 +262,7 @@ class ThesisCollection:
         """
         Create a chunk with the specified properties and return a DataObject.
         Args:
+            document_id (str): The identifier of the document the chunk belongs to.
             chunk (str): The text content of the chunk.
             chapter (str): The title of the chapter.
             section (str, optional): The title of the section. Defaults to None.
@@ -80,6 +274,7 @@ class ThesisCollection:
             wvc.data.DataObject: A DataObject representing the chunk with its properties.
         """
         data_properties = {
+            "document_id": document_id,
             "chunk": chunk,
             "chapter": chapter,
             "section": section,
@@ -93,6 +288,7 @@ class ThesisCollection:
 
     def add_manual_chunk(
         self,
+        document_id: str,
         text: str,
         chapter: str = "Manual Addition",
         section: str | None = None,
@@ -104,6 +300,7 @@ class ThesisCollection:
         Manually add a chunk to the collection with optional metadata.
 
         Args:
+            document_id (str): The identifier of the document the chunk belongs to.
             text (str): The text content of the chunk.
             chapter (str): Chapter name for the chunk. Defaults to "Manual Addition".
             section (str, optional): Section title. Defaults to None.
@@ -111,8 +308,11 @@ class ThesisCollection:
             subsubsection (str, optional): Subsubsection title. Defaults to None.
             paragraph (str, optional): Paragraph title. Defaults to None.
         """
-        chunk_index = self.collection.aggregate.over_all(total_count=True).total_count
+        chunk_index = self.collection.aggregate.over_all(
+            total_count=True, filters=self.document_filter(document_id)
+        ).total_count
         data_properties = {
+            "document_id": document_id,
             "chunk": text,
             "chapter": chapter,
             "section": section,
@@ -122,3 +322,85 @@ class ThesisCollection:
             "chunk_index": chunk_index,
         }
         self.collection.data.insert(properties=data_properties)
+
+
+@beartype
+class DocumentCatalog:
+    """
+    A class to manage a Weaviate collection holding the metadata of each indexed document, such
+    as its title and author. Objects are keyed by a UUID derived from the document identifier.
+    Args:
+        client (weaviate.Client): The Weaviate client instance.
+        name (str): The name of the collection. Defaults to "thesis_documents".
+        reset (bool): If True, resets the collection by deleting it if it exists. Defaults to False.
+    """
+
+    NAME = "thesis_documents"
+
+    def __init__(
+        self, client: weaviate.client.WeaviateClient, name: str = NAME, reset: bool = False
+    ):
+        self.client = client
+        self.name = name
+
+        if reset and client.collections.exists(name):
+            client.collections.delete(name)
+
+        if not client.collections.exists(name):
+            self.collection = self._create_collection()
+        else:
+            self.collection = client.collections.get(name)
+
+    def _create_collection(self) -> Collection:
+        """
+        Create a Weaviate collection for document metadata, without vectorizer.
+        Returns:
+            weaviate.Collection: The created collection instance.
+        """
+        return self.client.collections.create(
+            name=self.name,
+            properties=[
+                wvc.config.Property(
+                    name="document_id",
+                    data_type=wvc.config.DataType.TEXT,
+                    tokenization=wvc.config.Tokenization.FIELD,
+                ),
+                wvc.config.Property(name="title", data_type=wvc.config.DataType.TEXT),
+                wvc.config.Property(name="author", data_type=wvc.config.DataType.TEXT),
+            ],
+            vectorizer_config=wvc.config.Configure.Vectorizer.none(),
+        )
+
+    def register(self, document_id: str, title: str, author: str) -> None:
+        """
+        Add or replace the metadata of a document.
+        Args:
+            document_id (str): The document identifier.
+            title (str): The title of the document.
+            author (str): The author of the document.
+        """
+        uuid = generate_uuid5(document_id)
+        properties = {"document_id": document_id, "title": title, "author": author}
+        if self.collection.data.exists(uuid):
+            self.collection.data.replace(uuid=uuid, properties=properties)
+        else:
+            self.collection.data.insert(properties=properties, uuid=uuid)
+
+    @staticmethod
+    def lookup(
+        client: weaviate.client.WeaviateClient, document_id: str, name: str = NAME
+    ) -> dict | None:
+        """
+        Look up the metadata of a document without creating the collection, for read-only
+        callers such as the retriever.
+        Args:
+            client (weaviate.Client): The Weaviate client instance.
+            document_id (str): The document identifier.
+            name (str): The name of the collection. Defaults to "thesis_documents".
+        Returns:
+            dict: The document's properties, or None if it is not registered.
+        """
+        if not client.collections.exists(name):
+            return None
+        obj = client.collections.get(name).query.fetch_object_by_id(generate_uuid5(document_id))
+        return dict(obj.properties) if obj is not None else None
@@ -0,0 +1,177 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from beartype import beartype
+from weaviate.collections import Collection
+from weaviate.util import generate_uuid5
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UploadReport:
+    """
+    A dataclass summarising the outcome of an upload run.
+    It includes throughput, the objects that could not be stored and the result of the
+    consistency check. `sent`, `errors` and `elapsed` cover every pass including retries, where
+    `elapsed` only counts time spent sending, not the backoff between passes.
+    """
+
+    expected: int
+    stored: int = 0
+    attempts: int = 0
+    sent: int = 0
+    elapsed: float = 0.0
+    errors: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def objects_per_second(self) -> float:
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.sent if self.sent else 0.0
+
+    @property
+    def consistent(self) -> bool:
+        return not self.failed and self.stored == self.expected
+
+
+@beartype
+class BatchUploader:
+    """
+    Upload objects to a Weaviate collection using concurrent batches.
+    Objects that fail are collected and retried with exponential backoff, and the stored object
+    count is compared against the number of objects produced once the upload has finished.
+    Objects get a deterministic UUID derived from their properties, so retries and re-runs
+    overwrite instead of duplicating.
+    Args:
+        collection (weaviate.Collection): The collection to upload to.
+        batch_size (int, optional): Number of objects per batch. If None, the batch size is
+            sized automatically based on the cluster's load. Defaults to None.
+        concurrent_requests (int): Number of batches sent in parallel. Defaults to 4.
+        max_retries (int): Number of times failed objects are retried. Defaults to 3.
+        backoff (float): Base delay in seconds between retries, doubled every attempt.
+            Defaults to 2.0.
+        report_every (int): Log throughput after this many queued objects. Defaults to 500.
+        filters (weaviate.classes.query.Filter, optional): Restricts the consistency check to the
+            matching objects, e.g. a single document in a shared collection. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        batch_size: int | None = None,
+        concurrent_requests: int = 4,
+        max_retries: int = 3,
+        backoff: float = 2.0,
+        report_every: int = 500,
+        filters=None,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.concurrent_requests = concurrent_requests
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.report_every = report_every
+        self.filters = filters
+
+    def _batch(self):
+        """
+        Open a batch context on the collection.
+        Returns:
+            A dynamic batch if no batch size is set, otherwise a fixed-size batch.
+        """
+        if self.batch_size is None:
+            return self.collection.batch.dynamic()
+        return self.collection.batch.fixed_size(
+            batch_size=self.batch_size,
+            concurrent_requests=self.concurrent_requests,
+        )
+
+    def _send(self, objects: Dict[str, dict], report: UploadReport) -> Dict[str, dict]:
+        """
+        Send objects in a single batch pass and collect the ones that failed.
+        Args:
+            objects (dict): Mapping of UUID to the object's properties and vector.
+            report (UploadReport): The report to update with errors and failure messages.
+        Returns:
+            dict: The subset of `objects` that failed.
+        """
+        start = time.perf_counter()
+        with self._batch() as batch:
+            for i, (uuid, obj) in enumerate(objects.items(), start=1):
+                batch.add_object(uuid=uuid, **obj)
+                if i % self.report_every == 0:
+                    elapsed = time.perf_counter() - start
+                    logger.info(
+                        f"Queued {i}/{len(objects)} objects "
+                        f"({i / elapsed:.1f} obj/s, {batch.number_errors} errors, "
+                        f"error rate {batch.number_errors / i:.2%})"
+                    )
+
+        report.elapsed += time.perf_counter() - start
+        report.sent += len(objects)
+
+        failed = dict()
+        for error in self.collection.batch.failed_objects:
+            uuid = str(error.object_.uuid)
+            failed[uuid] = objects[uuid]
+            report.failed[uuid] = error.message
+        report.errors += len(failed)
+        return failed
+
+    def upload(
+        self, objects: List[dict], vectors: List[list | None] | None = None
+    ) -> UploadReport:
+        """
+        Upload objects to the collection, retrying failures and verifying the final count.
+        Args:
+            objects (list): The properties of each object to upload.
+            vectors (list, optional): A precomputed vector for each object. If None, the
+                collection's vectorizer computes them. Defaults to None.
+        Returns:
+            UploadReport: The outcome of the upload.
+        """
+        if vectors is None:
+            vectors = [None] * len(objects)
+        pending = {
+            str(generate_uuid5(properties)): {"properties": properties, "vector": vector}
+            for properties, vector in zip(objects, vectors)
+        }
+        report = UploadReport(expected=len(pending))
+        if len(pending) != len(objects):
+            logger.warning(
+                f"{len(objects) - len(pending)} duplicate objects were dropped before uploading."
+            )
+
+        while pending and report.attempts <= self.max_retries:
+            if report.attempts:
+                delay = self.backoff * 2 ** (report.attempts - 1)
+                logger.warning(
+                    f"Retrying {len(pending)} failed objects in {delay:.1f}s "
+                    f"(attempt {report.attempts}/{self.max_retries})."
+                )
+                time.sleep(delay)
+            report.failed.clear()
+            pending = self._send(pending, report)
+            report.attempts += 1
+
+        report.stored = (
+            self.collection.aggregate.over_all(total_count=True, filters=self.filters).total_count
+            or 0
+        )
+        logger.info(
+            f"Sent {report.sent} objects in {report.elapsed:.1f}s "
+            f"({report.objects_per_second:.1f} obj/s, error rate {report.error_rate:.2%})."
+        )
+        for uuid, message in report.failed.items():
+            logger.error(f"Object {uuid} failed after {report.attempts} attempts: {message}")
+        if report.stored != report.expected:
+            logger.error(
+                f"Collection holds {report.stored} objects but {report.expected} were produced."
+            )
+        return report
@@ -1,10 +1,18 @@
 import logging
 import os
+import threading
+from contextlib import contextmanager
+from typing import Dict
 
 import weaviate
 from beartype import beartype
 from dotenv import load_dotenv
-from weaviate.classes.init import Auth
+from weaviate.classes.init import AdditionalConfig, Auth
+from weaviate.exceptions import (
+    WeaviateClosedClientError,
+    WeaviateConnectionError,
+    WeaviateGRPCUnavailableError,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -12,20 +20,32 @@ logger.setLevel(logging.INFO)
 # This is necessary to access the Weaviate URL and API key.
 load_dotenv()
 
+# Errors after which a connection is considered broken and replaced.
+CONNECTION_ERRORS = (
+    WeaviateClosedClientError,
+    WeaviateConnectionError,
+    WeaviateGRPCUnavailableError,
+)
+
 
 @beartype
 class WeaviateDB:
-    def __init__(self, headers: dict = None):
+    def __init__(
+        self, headers: dict = None, additional_config: AdditionalConfig | None = None
+    ):
         """
         Initialize the WeaviateDB client with the provided headers.
         Args:
             headers (dict, optional): Additional headers to include in the connection request,
             (e.g. OpenAI API key).
+            additional_config (AdditionalConfig, optional): Additional client settings, such as
+            connection and query timeouts.
         """
         self.client = self._connect_to_cloud(
             cluster_url=os.environ["WEAVIATE_URL"],
             auth_credentials=Auth.api_key(os.environ["WEAVIATE_API_KEY"]),
             headers=headers,
+            additional_config=additional_config,
         )
         assert self.client.is_ready(), "Weaviate client is not ready."
 
@@ -34,6 +54,7 @@ class WeaviateDB:
         cluster_url: str,
         auth_credentials: weaviate.auth._APIKey,
         headers: dict = None,
+        additional_config: AdditionalConfig | None = None,
     ) -> weaviate.client.WeaviateClient:
         """
         Connect to Weaviate Cloud using the provided cluster URL and authentication credentials.
@@ -43,6 +64,8 @@ class WeaviateDB:
             auth_credentials (Auth): Authentication credentials for accessing the cluster.
             headers (dict, optional): Additional headers to include in the connection request,
             (e.g. OpenAI API key).
+            additional_config (AdditionalConfig, optional): Additional client settings, such as
+            connection and query timeouts.
 
         Returns:
             weaviate.Client: A Weaviate client instance connected to the specified cluster.
@@ -51,6 +74,7 @@ class WeaviateDB:
             cluster_url=cluster_url,
             auth_credentials=auth_credentials,
             headers=headers,
+            additional_config=additional_config,
         )
 
     def close(self):
@@ -61,3 +85,84 @@ class WeaviateDB:
 
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
+
+
+@beartype
+class SharedWeaviateDB:
+    """
+    A WeaviateDB connection shared between threads. Threads lease the client for the duration
+    of a call. After a connection-level error the connection is replaced for new leases, and the
+    broken one is closed once its last lease is returned. Connecting happens outside the lock,
+    so a slow reconnect does not block threads holding other leases.
+    Args:
+        headers (dict, optional): Additional headers to include in the connection request,
+        (e.g. OpenAI API key).
+        additional_config (AdditionalConfig, optional): Additional client settings, such as
+        connection and query timeouts.
+    """
+
+    def __init__(
+        self, headers: dict | None = None, additional_config: AdditionalConfig | None = None
+    ):
+        self.headers = headers
+        self.additional_config = additional_config
+        self._current: WeaviateDB | None = None
+        self._leases: Dict[WeaviateDB, int] = dict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self):
+        """
+        Lease the shared client, connecting if there is no healthy connection.
+        Yields:
+            weaviate.Client: The connected client.
+        """
+        db_client = self._acquire()
+        try:
+            yield db_client.client
+        except CONNECTION_ERRORS:
+            self._retire(db_client)
+            raise
+        finally:
+            self._release(db_client)
+
+    def _acquire(self):
+        with self._lock:
+            if self._current is not None:
+                self._leases[self._current] += 1
+                return self._current
+
+        connected = WeaviateDB(headers=self.headers, additional_config=self.additional_config)
+        with self._lock:
+            # Another thread may have connected in the meantime, prefer its connection.
+            if self._current is None:
+                self._current = connected
+                self._leases[connected] = 0
+            self._leases[self._current] += 1
+            current = self._current
+        if current is not connected:
+            self._close(connected)
+        return current
+
+    def _retire(self, db_client) -> None:
+        with self._lock:
+            # Only retire the connection that failed, never a newer one another thread made.
+            if self._current is db_client:
+                logger.warning("Weaviate connection failed, reconnecting on next use.")
+                self._current = None
+
+    def _release(self, db_client) -> None:
+        with self._lock:
+            self._leases[db_client] -= 1
+            retired = self._current is not db_client and self._leases[db_client] == 0
+            if retired:
+                del self._leases[db_client]
+        if retired:
+            self._close(db_client)
+
+    @staticmethod
+    def _close(db_client) -> None:
+        try:
+            db_client.close()
+        except Exception:
+            logger.warning("Failed to close a Weaviate connection.")
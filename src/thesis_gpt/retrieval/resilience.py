@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from beartype import beartype
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because its circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class DeadlineBudget:
+    """
+    A dataclass holding the end-to-end time budget of a query, split per stage (in seconds).
+    """
+
+    connect: float = 5.0
+    search: float = 5.0
+    generation: float = 20.0
+
+    @property
+    def total(self) -> float:
+        return self.connect + self.search + self.generation
+
+
+@beartype
+class Deadline:
+    """
+    Track the time remaining until a fixed point in the future.
+    Args:
+        seconds (float): The time budget, starting now.
+    """
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """
+        Returns:
+            float: Seconds left before the deadline, never negative.
+        """
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def require(self, stage_budget: float) -> None:
+        """
+        Check that enough time is left to run a stage within the deadline.
+        Args:
+            stage_budget (float): The share of the budget reserved for the stage.
+        Raises:
+            TimeoutError: If less than `stage_budget` seconds remain.
+        """
+        if self.remaining() < stage_budget:
+            raise TimeoutError("Not enough time left before the query deadline.")
+
+
+@beartype
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker guarding calls to an upstream service.
+    The circuit opens after `failure_threshold` consecutive failures and rejects calls until
+    `reset_timeout` seconds have passed. It then lets a single trial call through (half-open):
+    a success closes the circuit again, a failure re-opens it. Calls are best wrapped in
+    `guard()`, which records the outcome of every call, whatever it raises.
+    Args:
+        name (str): The name of the upstream service, used for logging.
+        failure_threshold (int): Consecutive failures before the circuit opens. Defaults to 3.
+        reset_timeout (float): Seconds the circuit stays open. Defaults to 30.0.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Check whether calls are rejected right now, without claiming the half-open trial.
+        Returns:
+            bool: True if the circuit is open and has not cooled down yet.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            return time.monotonic() - self._opened_at < self.reset_timeout
+
+    def acquire(self) -> None:
+        """
+        Check whether a call may proceed.
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return None
+            cooled_down = time.monotonic() - self._opened_at >= self.reset_timeout
+            if not cooled_down or self._trial_running:
+                raise CircuitOpenError(f"Circuit for {self.name} is open.")
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"Circuit for {self.name} closed.")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_running:
+                    logger.warning(
+                        f"Circuit for {self.name} opened after {self._failures} failures."
+                    )
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    @contextmanager
+    def guard(self):
+        """
+        Run the enclosed block as a call through the breaker.
+        Any exception raised by the block counts as a failure and is re-raised.
+        Raises:
+            CircuitOpenError: If the circuit is open, before the block runs.
+        """
+        self.acquire()
+        try:
+            yield
+        except BaseException:
+            self.record_failure()
+            raise
+        self.record_success()
@@ -1,11 +1,28 @@
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from beartype import beartype
 
 from dotenv import load_dotenv
+from weaviate.classes.init import AdditionalConfig, Timeout
+from weaviate.classes.query import Filter
+from weaviate.exceptions import WeaviateQueryError
 
-from thesis_gpt.preprocess.vectorstore.weaviate_client import WeaviateDB
+from thesis_gpt.preprocess.vectorstore.collections import (
+    HEADING_PROPERTIES,
+    DocumentCatalog,
+    ThesisCollection,
+)
+from thesis_gpt.preprocess.vectorstore.weaviate_client import SharedWeaviateDB
+from thesis_gpt.retrieval.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    DeadlineBudget,
+)
 
 logger = logging.getLogger(__name__)
 load_dotenv()
@@ -15,17 +32,20 @@ load_dotenv()
 class ThesisPrompt:
     """
     A dataclass to hold the prompt template for querying the thesis.
-    It includes the system prompt.
+    It includes the system prompt. The title and author are the document's metadata as
+    registered in the DocumentCatalog.
     """
 
     query: str
+    title: str
+    author: str
 
     def __post_init__(self):
         self.system = f"""
         You are an academic assistant helping answer questions based on retrieved text fragments from a PhD thesis.
 
-        Thesis title: "Advances in Machine Learning for Sensor Data with Applications in Smart Agriculture and Beyond"  
-        Author: Boje Deforce
+        Thesis title: "{self.title}"  
+        Author: {self.author}
 
         Guidelines:
         1. Use only the retrieved text fragments and provided context to answer the question. Do not use outside knowledge.
@@ -50,30 +70,230 @@ class ThesisRetriever:
     A class to retrieve information from a thesis using Weaviate as a vector store.
     It allows querying the thesis content and retrieving relevant chunks based on the query.
     These chunks are then used to generate a response that summarizes the relevant information.
+
+    Every query honours an end-to-end deadline split across connection, search and generation.
+    Search and generation each use a long-lived client whose own timeouts are set to the
+    stage's budget, so no upstream call outlives it. Weaviate and the generative model each sit
+    behind a circuit breaker. While a circuit is open, the retriever serves a cached answer if
+    one exists, or else the top retrieved passages with their headings. The query is vectorized
+    by OpenAI too, so while OpenAI is down passages are found by keyword (BM25) search instead.
+
+    All documents share one collection. Queries are pre-filtered on the document and,
+    optionally, on chapter and section, so the vector search only covers matching chunks.
     """
 
+    BUDGET = DeadlineBudget()
+    CACHE_SIZE = 256
+    # Seconds before document metadata is looked up again, so re-registered titles show up.
+    CATALOG_TTL = 300.0
+    UNKNOWN_DOCUMENT = "⚠️ The document {!r} has not been indexed."
+    UNAVAILABLE = (
+        "⚠️ The assistant is temporarily unavailable. Please try again in a moment."
+    )
+
+    _search_breaker = CircuitBreaker("Weaviate")
+    _generation_breaker = CircuitBreaker("OpenAI")
+    _clients: dict = dict()
+    _clients_lock = threading.Lock()
+    _answers: OrderedDict = OrderedDict()
+    _answers_lock = threading.Lock()
+    _documents: dict = dict()
+
+    @staticmethod
+    def _client(stage: str, timeout: float) -> SharedWeaviateDB:
+        """
+        Get the shared client of a stage. It connects on its first lease.
+        Args:
+            stage (str): The stage the client serves, e.g. "search" or "generation".
+            timeout (float): The query timeout of the client, i.e. the stage's budget.
+        Returns:
+            SharedWeaviateDB: The shared client, to be leased for each call.
+        """
+        with ThesisRetriever._clients_lock:
+            if stage not in ThesisRetriever._clients:
+                timeouts = Timeout(
+                    init=ThesisRetriever.BUDGET.connect, query=timeout, insert=timeout
+                )
+                ThesisRetriever._clients[stage] = SharedWeaviateDB(
+                    headers={"X-Openai-Api-Key": os.getenv("OPENAI_APIKEY")},
+                    additional_config=AdditionalConfig(timeout=timeouts),
+                )
+            return ThesisRetriever._clients[stage]
+
+    @staticmethod
+    def _cached_answer(key: tuple) -> str | None:
+        with ThesisRetriever._answers_lock:
+            return ThesisRetriever._answers.get(key)
+
+    @staticmethod
+    def _cache_answer(key: tuple, answer: str) -> None:
+        with ThesisRetriever._answers_lock:
+            ThesisRetriever._answers[key] = answer
+            ThesisRetriever._answers.move_to_end(key)
+            if len(ThesisRetriever._answers) > ThesisRetriever.CACHE_SIZE:
+                ThesisRetriever._answers.popitem(last=False)
+
+    @staticmethod
+    def _document_metadata(client, document_id: str) -> dict | None:
+        """
+        Look up the title and author of a document, caching them for `CATALOG_TTL` seconds.
+        Args:
+            client (weaviate.Client): The Weaviate client instance.
+            document_id (str): The document identifier.
+        Returns:
+            dict: The document's metadata, or None if it is not registered.
+        """
+        fetched_at, metadata = ThesisRetriever._documents.get(document_id, (None, None))
+        if fetched_at is None or time.monotonic() - fetched_at > ThesisRetriever.CATALOG_TTL:
+            metadata = DocumentCatalog.lookup(client, document_id)
+            if metadata is not None:
+                ThesisRetriever._documents[document_id] = (time.monotonic(), metadata)
+        return metadata
+
+    @staticmethod
+    def _filters(document_id: str, chapter: str | None, section: str | None):
+        """
+        Build the pre-filter restricting the search to a document and its headings.
+        Args:
+            document_id (str): The document identifier.
+            chapter (str, optional): The chapter title to search in.
+            section (str, optional): The section title to search in.
+        Returns:
+            weaviate.classes.query.Filter: The combined filter.
+        """
+        filters = [ThesisCollection.document_filter(document_id)]
+        if chapter is not None:
+            filters.append(Filter.by_property("chapter").equal(chapter))
+        if section is not None:
+            filters.append(Filter.by_property("section").equal(section))
+        return Filter.all_of(filters)
+
+    @staticmethod
+    def _format_passages(objects: list) -> str:
+        """
+        Format retrieved objects as a fallback answer, quoting each passage under its headings.
+        Args:
+            objects (list): The objects returned by the search.
+        Returns:
+            str: The passages as Markdown.
+        """
+        passages = []
+        for obj in objects:
+            headings = [
+                obj.properties[name]
+                for name in HEADING_PROPERTIES
+                if obj.properties.get(name)
+            ]
+            quote = "\n".join(f"> {line}" for line in obj.properties["chunk"].splitlines())
+            passages.append(f"**{' › '.join(headings) or 'Thesis'}**\n\n{quote}")
+        return (
+            "⚠️ Answer generation is temporarily unavailable. "
+            "These are the most relevant passages from the thesis:\n\n"
+            + "\n\n".join(passages)
+        )
+
     @staticmethod
-    def retrieve(query: str):
+    def _degrade(key: tuple, objects: list | None = None) -> str:
+        """
+        Build the best available answer when an upstream service is unavailable.
+        Args:
+            key (tuple): The cache key of the query.
+            objects (list, optional): Objects retrieved before the failure, if any.
+        Returns:
+            str: A cached answer, the retrieved passages or an unavailability notice.
+        """
+        cached = ThesisRetriever._cached_answer(key)
+        if cached is not None:
+            logger.info("Serving cached answer.")
+            return cached
+        if objects:
+            logger.info("Serving retrieved passages without generation.")
+            return ThesisRetriever._format_passages(objects)
+        return ThesisRetriever.UNAVAILABLE
+
+    @staticmethod
+    def retrieve(
+        query: str,
+        document_id: str,
+        chapter: str | None = None,
+        section: str | None = None,
+    ):
         """
         Retrieve relevant chunks from the thesis based on the provided query.
         Args:
             query (str): The query string to search for in the thesis.
+            document_id (str): The identifier of the document to search in.
+            chapter (str, optional): Restrict the search to this chapter. Defaults to None.
+            section (str, optional): Restrict the search to this section. Defaults to None.
         Returns:
-            str: The generated response based on the retrieved chunks.
+            str: The generated response based on the retrieved chunks, or a degraded response
+            if the deadline is exceeded or an upstream service is unavailable.
         """
-        with WeaviateDB(headers={"X-Openai-Api-Key": os.getenv("OPENAI_APIKEY")}) as db_client:
-            collection = db_client.client.collections.get("thesis_chunks")
-            response = collection.generate.near_text(
-                query=query,
-                limit=5,
-                grouped_task=ThesisPrompt(query).system,
-                return_properties=[
-                    "chapter",
-                    "section",
-                    "subsection",
-                    "subsubsection",
-                    "paragraph",
-                ],
-            )
-            logger.info(f"Querying Weaviate with: {query}")
+        budget = ThesisRetriever.BUDGET
+        deadline = Deadline(budget.total)
+        key = (document_id, chapter, section, query.strip().lower())
+        logger.info(f"Querying Weaviate with: {query}")
+
+        objects = None
+        # Vectorizing the query needs OpenAI, so skip it while OpenAI's circuit is open.
+        vectorized = not ThesisRetriever._generation_breaker.is_open
+        try:
+            with ThesisRetriever._search_breaker.guard():
+                with ThesisRetriever._client("search", budget.search).lease() as client:
+                    metadata = ThesisRetriever._document_metadata(client, document_id)
+                    if metadata is None:
+                        logger.error(f"Document {document_id!r} is not in the catalog.")
+                        return ThesisRetriever.UNKNOWN_DOCUMENT.format(document_id)
+                    collection = client.collections.get("thesis_chunks")
+                    filters = ThesisRetriever._filters(document_id, chapter, section)
+                    if vectorized:
+                        try:
+                            objects = collection.query.near_text(
+                                query=query,
+                                limit=5,
+                                filters=filters,
+                                return_properties=["chunk", *HEADING_PROPERTIES],
+                            ).objects
+                        except WeaviateQueryError as e:
+                            if "vectorize" not in e.message:
+                                raise
+                            logger.warning(f"Query vectorization failed: {e.message}")
+                            ThesisRetriever._generation_breaker.record_failure()
+                            vectorized = False
+                    if not vectorized:
+                        logger.info("Falling back to keyword search.")
+                        objects = collection.query.bm25(
+                            query=query,
+                            query_properties=["chunk"],
+                            limit=5,
+                            filters=filters,
+                            return_properties=["chunk", *HEADING_PROPERTIES],
+                        ).objects
+
+            if not objects:
+                return "No relevant passages were found in the thesis."
+            if not vectorized:
+                return ThesisRetriever._degrade(key, objects)
+
+            deadline.require(budget.generation)
+            with ThesisRetriever._generation_breaker.guard():
+                with ThesisRetriever._client("generation", budget.generation).lease() as client:
+                    collection = client.collections.get("thesis_chunks")
+                    response = collection.generate.fetch_objects_by_ids(
+                        ids=[obj.uuid for obj in objects],
+                        grouped_task=ThesisPrompt(
+                            query, metadata["title"], metadata["author"]
+                        ).system,
+                        return_properties=HEADING_PROPERTIES,
+                    )
+                if response.generated is None:
+                    raise RuntimeError("No answer was generated.")
+        except CircuitOpenError as e:
+            logger.warning(f"{e} Degrading response.")
+            return ThesisRetriever._degrade(key, objects)
+        except Exception:
+            logger.exception("Query failed. Degrading response.")
+            return ThesisRetriever._degrade(key, objects)
+
+        ThesisRetriever._cache_answer(key, response.generated)
         return response.generated
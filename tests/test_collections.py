@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.documents import Document
+from weaviate.classes.config import Tokenization
+from weaviate.client import WeaviateClient
+from weaviate.collections import Collection
+from weaviate.util import generate_uuid5
+
+from thesis_gpt.preprocess.vectorstore.benchmark import (
+    estimate_memory,
+    percentile_95,
+    pq_trained,
+    search,
+)
+from thesis_gpt.preprocess.vectorstore.collections import (
+    INDEX_PROFILES,
+    DocumentCatalog,
+    IndexProfile,
+    ThesisCollection,
+)
+
+
+def test_flat_index_rejects_pq():
+    with pytest.raises(ValueError):
+        IndexProfile(index="flat", quantizer="pq")
+
+
+@pytest.mark.parametrize("name", sorted(INDEX_PROFILES))
+def test_presets_build_vector_index_config(name):
+    assert INDEX_PROFILES[name].vector_index_config() is not None
+
+
+def test_chunk_properties():
+    docs = [
+        Document(page_content="first", metadata={"chapter": "Intro", "section": "Motivation"}),
+        Document(page_content="second", metadata={"chapter": "Intro"}),
+    ]
+    properties = ThesisCollection.chunk_properties("thesis", docs)
+
+    assert [p["chunk_index"] for p in properties] == [0, 1]
+    assert all(p["document_id"] == "thesis" for p in properties)
+    assert properties[0]["section"] == "Motivation"
+    assert properties[1]["section"] is None
+
+
+def test_pq_counts_as_uncompressed_until_trained():
+    profile = IndexProfile(quantizer="pq", pq_segments=128, pq_training_limit=1000)
+    uncompressed = estimate_memory(IndexProfile(), 500, 1536)
+
+    assert not pq_trained(profile, 500)
+    assert estimate_memory(profile, 500, 1536) == uncompressed
+    assert pq_trained(profile, 1000)
+    assert estimate_memory(profile, 1000, 1536) < 2 * uncompressed / 10
+
+
+def test_uncached_flat_index_is_on_disk():
+    assert estimate_memory(IndexProfile(index="flat"), 1000, 1536) == 0
+    assert estimate_memory(IndexProfile(index="flat", quantizer="bq"), 1000, 1536) == 192_000
+
+
+def fake_client(exists: bool) -> MagicMock:
+    client = MagicMock(spec=WeaviateClient)
+    client.collections = MagicMock()
+    client.collections.exists.return_value = exists
+    client.collections.create.return_value = MagicMock(spec=Collection)
+    return client
+
+
+def test_filterable_headings_use_field_tokenization():
+    client = fake_client(exists=False)
+    profile = IndexProfile(filterable={"paragraph": False})
+    ThesisCollection(client, name="thesis_chunks", profile=profile)
+
+    properties = {p.name: p for p in client.collections.create.call_args.kwargs["properties"]}
+    assert properties["document_id"].skip_vectorization
+    assert properties["chapter"].tokenization == Tokenization.FIELD
+    assert properties["section"].tokenization == Tokenization.FIELD
+    assert properties["paragraph"].tokenization is None
+    assert properties["chunk"].tokenization is None
+
+
+def test_percentile_95_of_small_samples():
+    assert percentile_95([3.0]) == 3.0
+    assert percentile_95([1.0, 2.0]) >= 2.0
+
+
+def test_search_excludes_the_query_object():
+    collection = MagicMock(spec=Collection)
+    collection.query = MagicMock()
+    collection.query.near_vector.return_value = SimpleNamespace(
+        objects=[SimpleNamespace(uuid=uuid) for uuid in ["a", "b", "c"]]
+    )
+    results, latencies = search(collection, {"a": [0.1, 0.2]}, limit=2)
+
+    assert results == [{"b", "c"}]
+    assert len(latencies) == 1
+    assert collection.query.near_vector.call_args.kwargs["limit"] == 3
+
+
+def test_delete_stale_chunks_keeps_current_and_other_documents():
+    client = fake_client(exists=False)
+    thesis = ThesisCollection(client, name="thesis_chunks")
+    new, old, other = (generate_uuid5(name) for name in ["new", "old", "other"])
+    thesis.collection.iterator.return_value = [
+        SimpleNamespace(uuid=uuid, properties={"document_id": document_id})
+        for uuid, document_id in [(new, "thesis"), (old, "thesis"), (other, "paper")]
+    ]
+    thesis.collection.data = MagicMock()
+
+    assert thesis.delete_stale_chunks("thesis", keep=[new]) == 1
+    assert thesis.delete_stale_chunks("paper", keep=[other]) == 0
+    thesis.collection.data.delete_many.assert_called_once()
+
+
+def test_lookup_returns_a_copy_of_the_properties():
+    client = fake_client(exists=True)
+    properties = {"document_id": "thesis", "title": "Title", "author": "A"}
+    query = client.collections.get.return_value.query
+    query.fetch_object_by_id.return_value = SimpleNamespace(properties=properties)
+
+    metadata = DocumentCatalog.lookup(client, "thesis")
+
+    assert metadata == properties
+    assert metadata is not properties
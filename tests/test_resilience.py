@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from thesis_gpt.retrieval.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    DeadlineBudget,
+)
+
+
+def fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        with pytest.raises(ValueError):
+            with breaker.guard():
+                raise ValueError("upstream down")
+
+
+def test_budget_total():
+    assert DeadlineBudget(connect=1.0, search=2.0, generation=3.0).total == 6.0
+
+
+def test_deadline_require():
+    deadline = Deadline(10.0)
+    assert 0.0 < deadline.remaining() <= 10.0
+    deadline.require(5.0)
+    with pytest.raises(TimeoutError):
+        deadline.require(20.0)
+
+
+def test_expired_deadline():
+    deadline = Deadline(0.0)
+    assert deadline.remaining() == 0.0
+    with pytest.raises(TimeoutError):
+        deadline.require(0.1)
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60.0)
+    fail(breaker, 2)
+    breaker.acquire()
+    breaker.record_success()
+
+    fail(breaker, 3)
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60.0)
+    fail(breaker, 1)
+    with breaker.guard():
+        pass
+    fail(breaker, 1)
+    breaker.acquire()
+
+
+def test_half_open_allows_single_trial():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    fail(breaker, 1)
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    time.sleep(0.06)
+    breaker.acquire()
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    breaker.record_success()
+    breaker.acquire()
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    fail(breaker, 1)
+    time.sleep(0.06)
+    fail(breaker, 1)
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+
+def test_guard_records_any_exception():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    fail(breaker, 1)
+    time.sleep(0.06)
+    with pytest.raises(KeyboardInterrupt):
+        with breaker.guard():
+            raise KeyboardInterrupt
+
+    # The trial was recorded as a failure, so the circuit recovers after the next cool-down.
+    time.sleep(0.06)
+    with breaker.guard():
+        pass
+    breaker.acquire()
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from weaviate.client import WeaviateClient
+from weaviate.exceptions import WeaviateQueryError
+
+from thesis_gpt.retrieval import retriever
+from thesis_gpt.retrieval.resilience import CircuitBreaker, DeadlineBudget
+from thesis_gpt.retrieval.retriever import ThesisRetriever
+
+PASSAGE = SimpleNamespace(uuid="1", properties={"chunk": "MultiMix mixes.", "chapter": "Intro"})
+
+
+class FakeSharedClient:
+    """Stand-in for SharedWeaviateDB that leases a fixed client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @contextmanager
+    def lease(self):
+        yield self.client
+
+
+def fake_client() -> MagicMock:
+    client = MagicMock(spec=WeaviateClient)
+    client.collections = MagicMock()
+    return client
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    monkeypatch.setattr(ThesisRetriever, "_documents", dict())
+    monkeypatch.setattr(ThesisRetriever, "_clients", dict())
+    monkeypatch.setattr(ThesisRetriever, "_answers", OrderedDict())
+    monkeypatch.setattr(ThesisRetriever, "_search_breaker", CircuitBreaker("Weaviate"))
+    monkeypatch.setattr(ThesisRetriever, "_generation_breaker", CircuitBreaker("OpenAI"))
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """Stub the search and generation clients with a healthy document and answer."""
+    stages = {"search": fake_client(), "generation": fake_client()}
+    monkeypatch.setattr(
+        ThesisRetriever,
+        "_client",
+        staticmethod(lambda stage, timeout: FakeSharedClient(stages[stage])),
+    )
+    monkeypatch.setattr(
+        retriever.DocumentCatalog,
+        "lookup",
+        staticmethod(lambda client, document_id: {"title": "Title", "author": "A"}),
+    )
+    search = stages["search"].collections.get.return_value
+    search.query.near_text.return_value = SimpleNamespace(objects=[PASSAGE])
+    search.query.bm25.return_value = SimpleNamespace(objects=[PASSAGE])
+    generate = stages["generation"].collections.get.return_value.generate
+    generate.fetch_objects_by_ids.return_value = SimpleNamespace(generated="Answer.")
+    return SimpleNamespace(search=search.query, generate=generate)
+
+
+def test_unknown_document_returns_message(monkeypatch):
+    client = fake_client()
+    client.collections.exists.return_value = False
+    monkeypatch.setattr(
+        ThesisRetriever,
+        "_client",
+        staticmethod(lambda stage, timeout: FakeSharedClient(client)),
+    )
+
+    answer = ThesisRetriever.retrieve("What is MultiMix?", "missing")
+
+    assert answer == ThesisRetriever.UNKNOWN_DOCUMENT.format("missing")
+    client.collections.create.assert_not_called()
+
+
+def test_document_metadata_expires(monkeypatch):
+    titles = iter(["First title", "Second title"])
+    monkeypatch.setattr(
+        retriever.DocumentCatalog,
+        "lookup",
+        staticmethod(lambda client, document_id: {"title": next(titles), "author": "A"}),
+    )
+    monkeypatch.setattr(ThesisRetriever, "CATALOG_TTL", 0.0)
+
+    assert ThesisRetriever._document_metadata(None, "thesis")["title"] == "First title"
+    assert ThesisRetriever._document_metadata(None, "thesis")["title"] == "Second title"
+
+
+def test_document_metadata_is_cached(monkeypatch):
+    lookup = MagicMock(return_value={"title": "Title", "author": "A"})
+    monkeypatch.setattr(retriever.DocumentCatalog, "lookup", staticmethod(lookup))
+
+    ThesisRetriever._document_metadata(None, "thesis")
+    ThesisRetriever._document_metadata(None, "thesis")
+
+    assert lookup.call_count == 1
+
+
+def test_generated_answer_is_returned(clients):
+    assert ThesisRetriever.retrieve("What is MultiMix?", "thesis") == "Answer."
+
+
+def test_cached_answer_served_when_generation_fails(clients):
+    ThesisRetriever.retrieve("What is MultiMix?", "thesis")
+    clients.generate.fetch_objects_by_ids.side_effect = RuntimeError("OpenAI down")
+
+    assert ThesisRetriever.retrieve(" what is multimix? ", "thesis") == "Answer."
+
+
+def test_passages_served_when_generation_fails(clients):
+    clients.generate.fetch_objects_by_ids.side_effect = RuntimeError("OpenAI down")
+
+    answer = ThesisRetriever.retrieve("What is MultiMix?", "thesis")
+
+    assert "> MultiMix mixes." in answer
+    assert "**Intro**" in answer
+
+
+def test_passages_served_when_generation_circuit_is_open(clients, monkeypatch):
+    breaker = CircuitBreaker("OpenAI", failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    monkeypatch.setattr(ThesisRetriever, "_generation_breaker", breaker)
+
+    answer = ThesisRetriever.retrieve("What is MultiMix?", "thesis")
+
+    assert "> MultiMix mixes." in answer
+    clients.search.near_text.assert_not_called()
+    clients.search.bm25.assert_called_once()
+    clients.generate.fetch_objects_by_ids.assert_not_called()
+
+
+def test_passages_served_when_no_answer_is_generated(clients):
+    clients.generate.fetch_objects_by_ids.return_value = SimpleNamespace(generated=None)
+
+    assert "> MultiMix mixes." in ThesisRetriever.retrieve("What is MultiMix?", "thesis")
+
+
+def test_deadline_skips_generation(clients, monkeypatch):
+    # Without any slack, the generation stage no longer fits once the search has run.
+    monkeypatch.setattr(
+        ThesisRetriever, "BUDGET", DeadlineBudget(connect=0.0, search=0.0, generation=1.0)
+    )
+
+    answer = ThesisRetriever.retrieve("What is MultiMix?", "thesis")
+
+    assert "> MultiMix mixes." in answer
+    clients.generate.fetch_objects_by_ids.assert_not_called()
+
+
+def test_unavailable_when_search_fails(clients):
+    clients.search.near_text.side_effect = WeaviateQueryError("shard down", "GRPC")
+
+    assert ThesisRetriever.retrieve("What is MultiMix?", "thesis") == ThesisRetriever.UNAVAILABLE
+
+
+def test_keyword_search_when_vectorization_fails(clients, monkeypatch):
+    breaker = CircuitBreaker("OpenAI", failure_threshold=1, reset_timeout=60.0)
+    monkeypatch.setattr(ThesisRetriever, "_generation_breaker", breaker)
+    clients.search.near_text.side_effect = WeaviateQueryError(
+        "vectorize params: OpenAI API failed with status: 429", "GRPC"
+    )
+
+    answer = ThesisRetriever.retrieve("What is MultiMix?", "thesis")
+
+    assert "> MultiMix mixes." in answer
+    assert clients.search.bm25.call_args.kwargs["query_properties"] == ["chunk"]
+    clients.generate.fetch_objects_by_ids.assert_not_called()
+    assert breaker.is_open
+    assert not ThesisRetriever._search_breaker.is_open
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from weaviate.collections import Collection
+
+from thesis_gpt.preprocess.vectorstore.uploader import BatchUploader, UploadReport
+
+
+class FakeBatch:
+    """Stand-in for Weaviate's batch wrapper that fails chunks a set number of times."""
+
+    def __init__(self, failures: dict):
+        self.failures = failures
+        self.stored: set[str] = set()
+        self.failed_objects: list[SimpleNamespace] = list()
+        self.number_errors = 0
+
+    def dynamic(self):
+        self.failed_objects = list()
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_object(self, uuid, properties, vector=None):
+        if self.failures.get(properties["chunk"], 0) > 0:
+            self.failures[properties["chunk"]] -= 1
+            self.number_errors += 1
+            self.failed_objects.append(
+                SimpleNamespace(object_=SimpleNamespace(uuid=uuid), message="boom")
+            )
+        else:
+            self.stored.add(uuid)
+
+
+def fake_collection(failures: dict) -> MagicMock:
+    collection = MagicMock(spec=Collection)
+    collection.batch = FakeBatch(failures)
+    collection.aggregate = MagicMock()
+    collection.aggregate.over_all.side_effect = lambda **kwargs: SimpleNamespace(
+        total_count=len(collection.batch.stored)
+    )
+    return collection
+
+
+def objects(n: int) -> list:
+    return [{"chunk": f"chunk {i}", "chunk_index": i} for i in range(n)]
+
+
+def test_report_rates():
+    report = UploadReport(expected=10, sent=12, elapsed=2.0, errors=3)
+    assert report.objects_per_second == 6.0
+    assert report.error_rate == 0.25
+    assert UploadReport(expected=0).error_rate == 0.0
+    assert UploadReport(expected=0).objects_per_second == 0.0
+
+
+def test_report_consistent():
+    assert UploadReport(expected=3, stored=3).consistent
+    assert not UploadReport(expected=3, stored=2).consistent
+    assert not UploadReport(expected=3, stored=3, failed={"id": "boom"}).consistent
+
+
+def test_upload_retries_failed_objects():
+    collection = fake_collection({"chunk 1": 2})
+    report = BatchUploader(collection, max_retries=3, backoff=0.0).upload(objects(5))
+
+    assert report.consistent
+    assert report.attempts == 3
+    assert report.sent == 7
+    assert report.errors == 2
+    assert report.error_rate <= 1.0
+
+
+def test_upload_gives_up_after_max_retries():
+    collection = fake_collection({"chunk 0": 10})
+    report = BatchUploader(collection, max_retries=2, backoff=0.0).upload(objects(3))
+
+    assert not report.consistent
+    assert report.attempts == 3
+    assert report.stored == 2
+    assert list(report.failed.values()) == ["boom"]
+
+
+def test_upload_drops_duplicates():
+    collection = fake_collection({})
+    report = BatchUploader(collection, backoff=0.0).upload(objects(2) + objects(2))
+
+    assert report.expected == 2
+    assert report.consistent
@@ -0,0 +1,53 @@
+from unittest.mock import MagicMock
+
+import pytest
+from weaviate.exceptions import WeaviateConnectionError, WeaviateQueryError
+
+from thesis_gpt.preprocess.vectorstore import weaviate_client
+from thesis_gpt.preprocess.vectorstore.weaviate_client import SharedWeaviateDB
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Replace WeaviateDB with a factory recording every connection it makes."""
+    made = list()
+
+    def connect(**kwargs):
+        made.append(MagicMock())
+        return made[-1]
+
+    monkeypatch.setattr(weaviate_client, "WeaviateDB", connect)
+    return made
+
+
+def test_lease_reuses_connection(connections):
+    shared = SharedWeaviateDB()
+    with shared.lease() as first:
+        with shared.lease() as second:
+            assert first is second
+    assert len(connections) == 1
+    connections[0].close.assert_not_called()
+
+
+def test_query_errors_keep_connection(connections):
+    shared = SharedWeaviateDB()
+    with pytest.raises(WeaviateQueryError):
+        with shared.lease():
+            raise WeaviateQueryError("bad query", "GRPC")
+    with shared.lease():
+        pass
+    assert len(connections) == 1
+
+
+def test_broken_connection_closed_after_last_lease(connections):
+    shared = SharedWeaviateDB()
+    with shared.lease():
+        with pytest.raises(WeaviateConnectionError):
+            with shared.lease():
+                raise WeaviateConnectionError("connection reset")
+        # The other lease still holds the broken connection, so it stays open.
+        connections[0].close.assert_not_called()
+        with shared.lease():
+            assert len(connections) == 2
+    connections[0].close.assert_called_once()
+    connections[1].close.assert_not_called()